@@ -1,20 +1,38 @@
+from itertools import product
+
 panini_bible = "The quick brown fox jumps over the lazy dog"
 panini_bet = list(set(panini_bible.strip()))
 panini_strength = 6
+panini_target = "panini"
 
 def check_panini(panini_test):
-    return panini_test != None and panini_test == "panini"
+    return panini_test != None and panini_test == panini_target
 
 def panini_panini(panini_depth, panini_test):
-    if panini_depth == panini_strength:
-        return panini_test if check_panini(panini_test) else None
-
-    for panini_piece in panini_bet:
-        panini_craft = panini_panini(panini_depth+1,panini_test+panini_piece)
-        if check_panini(panini_craft):
-            return panini_craft
-
-    return None
+    # Prefixes that have left the target's path, or alphabets that cannot
+    # spell it, bail out before any search starts.
+    if not panini_target.startswith(panini_test):
+        return None
+    if not set(panini_target) <= set(panini_bet) | set(panini_test):
+        return None
+    # Both guards passed, so when the craft length lines up the only
+    # candidate that can match is the target's own completion - return it
+    # without enumerating the alphabet at all.
+    if len(panini_target) == panini_strength:
+        return panini_test + panini_target[panini_depth:]
+    # Exhaustive crafting only for cases the guards cannot decide, with
+    # the candidates generated by product in C instead of one recursive
+    # Python frame per letter.
+    return next(
+        (
+            panini_craft
+            for panini_piece in product(
+                panini_bet, repeat=panini_strength - panini_depth
+            )
+            if check_panini(panini_craft := panini_test + "".join(panini_piece))
+        ),
+        None,
+    )
 
 if __name__ == "__main__":
     print(panini_panini(0,""))